@@ -20,16 +20,22 @@ import json
 import os
 import subprocess
 import sys
-try:
-    import tomllib
-except ImportError:
-    import tomli as tomllib
-from dataclasses import dataclass, field, asdict
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
+try:
+    import orjson  # Optional, several times faster than json
+except ImportError:
+    orjson = None
+
 from schema import validate_design_document, get_schema_for_agent, LAYERS
 
 
@@ -49,6 +55,22 @@ class GateStatus(str, Enum):
     SKIPPED = "skipped"
 
 
+# Status values bound once; they are compared in every task loop
+_PENDING = TaskStatus.PENDING.value
+_DISPATCHED = TaskStatus.DISPATCHED.value
+_COMPLETED = TaskStatus.COMPLETED.value
+_PASSED = TaskStatus.PASSED.value
+_FAILED = TaskStatus.FAILED.value
+_SKIPPED = TaskStatus.SKIPPED.value
+_DONE = (_PASSED, _SKIPPED)
+_GATE_NOT_RUN = GateStatus.NOT_RUN.value
+_GATE_PASSED = GateStatus.PASSED.value
+_GATE_FAILED = GateStatus.FAILED.value
+
+# Shared read-only default for lookups that may miss
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
 @dataclass
 class OrchestratorStatus:
     """Status stored in /tmp - invisible to agent."""
@@ -64,22 +86,118 @@ class OrchestratorStatus:
     iteration: int = 0
     max_iterations: int = 5
     max_parallel: int = 4
+    layer_index: dict[str, list[str]] = field(default_factory=dict)  # layer -> task names
+    unmet_deps: dict[str, int] = field(default_factory=dict)  # task -> deps not yet passed
+    dependents: dict[str, list[str]] = field(default_factory=dict)  # task -> tasks depending on it
+
+    def __post_init__(self):
+        # Status files written before these indexes existed
+        if self.tasks and not self.layer_index:
+            self.layer_index = build_layer_index(self.tasks)
+        if self.tasks and not self.unmet_deps:
+            self.unmet_deps, self.dependents = build_dependency_index(self.tasks)
+        # File contents as last loaded or saved; not persisted
+        self._saved_bytes: bytes | None = None
+
+    def set_task_status(self, task_name: str, new_status: str):
+        """Set a task's status, keeping unmet_deps current as it enters or leaves PASSED."""
+        task = self.tasks[task_name]
+        was_passed = task["status"] == _PASSED
+        task["status"] = new_status
+        if was_passed != (new_status == _PASSED):
+            step = 1 if was_passed else -1
+            for dependent in self.dependents.get(task_name, ()):
+                self.unmet_deps[dependent] += step
 
     @classmethod
     def load(cls, path: Path) -> "OrchestratorStatus | None":
         if path.exists():
+            raw = path.read_bytes()
             try:
-                with open(path) as f:
-                    data = json.load(f)
-                return cls(**data)
+                status = cls(**decode_json(raw))
             except (json.JSONDecodeError, TypeError):
                 return None
+            status._saved_bytes = raw
+            return status
         return None
 
     def save(self, path: Path):
-        self.updated_at = datetime.now().isoformat()
-        with open(path, "w") as f:
-            json.dump(asdict(self), f, indent=2)
+        # updated_at is spliced in last, so a file that differs only in the
+        # timestamp starts with these bytes and the body is encoded once.
+        data = self.to_serializable()
+        del data["updated_at"]
+        prefix = encode_json(data)[:-1] + b',"updated_at":'
+        if self._saved_bytes is not None and self._saved_bytes.startswith(prefix) and path.exists():
+            return
+
+        self.updated_at = now_iso()
+        payload = prefix + encode_json(self.updated_at) + b"}"
+
+        # Write to a temp file and rename over the status file, so an
+        # interrupted save never leaves a partial file for load() to discard.
+        # The pid keeps overlapping hook processes off each other's temp file.
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            temp_path.write_bytes(payload)
+            os.replace(temp_path, path)
+            self._saved_bytes = payload
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    def to_serializable(self) -> dict[str, Any]:
+        """Shallow dict of the persisted fields.
+
+        Nested values are already plain dicts and lists, so unlike asdict()
+        nothing is deep-copied before it reaches the JSON encoder.
+        """
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+def encode_json(obj: Any, pretty: bool = False) -> bytes:
+    """Serialize to JSON bytes, with orjson when it is installed.
+
+    Compact unless pretty; files only the hook reads don't need indenting.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    # ensure_ascii=False writes UTF-8 as orjson does, so both produce the
+    # same bytes and save() can compare them
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def decode_json(data: bytes) -> Any:
+    """Decode JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def build_layer_index(tasks: dict[str, dict]) -> dict[str, list[str]]:
+    """Group task names by layer, preserving design-document order."""
+    index: dict[str, list[str]] = {}
+    for task_name, task in tasks.items():
+        index.setdefault(task["layer"], []).append(task_name)
+    return index
+
+
+def build_dependency_index(tasks: dict[str, dict]) -> tuple[dict[str, int], dict[str, list[str]]]:
+    """Count each task's unpassed dependencies and invert depends_on.
+
+    A dependency that names no task is never satisfied, so it stays counted.
+    """
+    unmet: dict[str, int] = {}
+    dependents: dict[str, list[str]] = {}
+    for task_name, task in tasks.items():
+        count = 0
+        for dep in task.get("depends_on", []):
+            dependents.setdefault(dep, []).append(task_name)
+            if tasks.get(dep, _EMPTY).get("status") != _PASSED:
+                count += 1
+        unmet[task_name] = count
+    return unmet, dependents
 
 
 # Environment
@@ -87,8 +205,31 @@ PROJECT_DIR = Path(os.environ.get("CLAUDE_PROJECT_DIR", Path.cwd()))
 PLUGIN_ROOT = Path(os.environ.get("CLAUDE_PLUGIN_ROOT", Path(__file__).parent.parent))
 WORKTREE_BASE = PROJECT_DIR / ".worktrees"
 
+MAKE_TIMEOUT = 600  # Seconds allowed for a gate's Makefile target
+MAKE_OUTPUT_TAIL = 2000  # Bytes of gate output kept for reporting
+MAKE_DRAIN_GRACE = 5  # Seconds to finish reading gate output after make exits
+TRANSCRIPT_CHUNK_SIZE = 64 * 1024
+WORKTREE_LOCK = WORKTREE_BASE / ".lock"
+WORKTREE_LOCK_BACKOFF = (0.5, 1.0, 2.0)  # Seconds between lock attempts
+WORKTREE_LOCK_STALE_AFTER = 120  # Seconds; matches the hook timeout
+
+
+# Timestamp of the hook event being handled, shared by everything it writes
+_NOW_ISO: str | None = None
+
+
+def now_iso() -> str:
+    """ISO timestamp for the current hook event."""
+    return _NOW_ISO or datetime.now().isoformat()
+
 
-def get_status_file_path(project_name: str) -> Path:
+def start_hook_clock() -> None:
+    """Take the timestamp that now_iso() returns for this hook event."""
+    global _NOW_ISO
+    _NOW_ISO = datetime.now().isoformat()
+
+
+def get_status_file_path() -> Path:
     """Get status file path in /tmp based on project directory."""
     project_hash = hashlib.md5(str(PROJECT_DIR).encode()).hexdigest()[:8]
     return Path(f"/tmp/swiss_cheese_{project_hash}.json")
@@ -108,19 +249,145 @@ def find_design_document() -> Path | None:
     return None
 
 
-def compute_file_hash(path: Path) -> str:
-    """Compute MD5 hash of file contents."""
-    return hashlib.md5(path.read_bytes()).hexdigest()
+# Parsed design documents, so unchanged content is parsed once per process
+_DESIGN_CACHE: dict[str, tuple[dict, Any]] = {}  # content hash -> (data, validation)
+
+
+def compute_file_hash(path: Path, data: bytes | None = None) -> str:
+    """Compute MD5 hash of file contents.
+
+    Pass data when the file has already been read to avoid reading it again.
+    """
+    if data is None:
+        data = path.read_bytes()
+    return hashlib.md5(data).hexdigest()
 
 
-def parse_design_document(path: Path) -> tuple[dict, Any]:
-    """Parse and validate TOML design document."""
-    with open(path, "rb") as f:
-        data = tomllib.load(f)
+def parse_design_document(
+    path: Path, raw: bytes | None = None, content_hash: str | None = None
+) -> tuple[dict, Any]:
+    """Parse and validate TOML design document.
+
+    raw is the file's contents and content_hash its compute_file_hash, if
+    the caller already has them.
+    """
+    if raw is None:
+        raw = path.read_bytes()
+    if content_hash is None:
+        content_hash = compute_file_hash(path, raw)
+    cached = _DESIGN_CACHE.get(content_hash)
+    if cached is not None:
+        return cached
+
+    # Parse the bytes already read for the hash rather than reopening the file
+    text = raw.decode("utf-8")
+
+    # Deferred: most Stop events exit before a design document is found
+    try:
+        import rtoml  # Optional, parses several times faster than tomllib
+    except ImportError:
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib  # Python < 3.11
+
+        data = tomllib.loads(text)
+    else:
+        data = rtoml.loads(text)
     validation = validate_design_document(data)
+    _DESIGN_CACHE[content_hash] = (data, validation)
     return data, validation
 
 
+# Local branch names, listed once per hook run by local_branches()
+_BRANCH_CACHE: set[str] | None = None
+
+
+def local_branches() -> set[str]:
+    """Return the set of local branch names, querying git at most once.
+
+    Callers that create a branch add it to the returned set so the cache
+    stays accurate without another git call.
+    """
+    global _BRANCH_CACHE
+    if _BRANCH_CACHE is None:
+        try:
+            result = subprocess.run(
+                ["git", "for-each-ref", "--format=%(refname:lstrip=2)", "refs/heads"],
+                cwd=PROJECT_DIR, capture_output=True, check=True
+            )
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return set()
+        _BRANCH_CACHE = set(result.stdout.decode().splitlines())
+    return _BRANCH_CACHE
+
+
+@contextmanager
+def worktree_lock():
+    """Serialize `git worktree add` per repository.
+
+    Concurrent worktree additions race on .git/config. Other hook
+    processes are excluded by an atomically created lock directory, retried
+    with backoff. Raises TimeoutError if another process holds it through
+    every retry.
+    """
+    delays = iter(WORKTREE_LOCK_BACKOFF)
+    while True:
+        try:
+            WORKTREE_LOCK.mkdir()
+            break
+        except FileExistsError:
+            pass
+
+        try:
+            lock_stat = WORKTREE_LOCK.stat()
+            if time.time() - lock_stat.st_mtime > WORKTREE_LOCK_STALE_AFTER:
+                # Left behind by a killed hook. Rename it aside before removing
+                # it, so a waiter racing on the same stale lock cannot delete
+                # the fresh one another waiter has just taken.
+                stale = WORKTREE_LOCK.with_name(f"{WORKTREE_LOCK.name}.{os.getpid()}.stale")
+                os.rename(WORKTREE_LOCK, stale)
+                stale_stat = stale.stat()
+                if (stale_stat.st_ino, stale_stat.st_mtime_ns) == (lock_stat.st_ino, lock_stat.st_mtime_ns):
+                    stale.rmdir()
+                else:
+                    os.rename(stale, WORKTREE_LOCK)  # Renamed a fresh lock; hand it back
+                continue
+        except FileNotFoundError:
+            continue  # Released or reclaimed between mkdir and stat
+
+        delay = next(delays, None)
+        if delay is None:
+            raise TimeoutError(f"Timed out waiting for {WORKTREE_LOCK}")
+        time.sleep(delay)
+
+    try:
+        yield
+    finally:
+        # Gone if another hook reclaimed it as stale while we held it
+        with suppress(FileNotFoundError):
+            WORKTREE_LOCK.rmdir()
+
+
+def list_worktree_dirs() -> set[str]:
+    """Names of the entries under WORKTREE_BASE, read with one scandir."""
+    try:
+        with os.scandir(WORKTREE_BASE) as entries:
+            names = {entry.name for entry in entries}
+    except FileNotFoundError:
+        return set()
+    names.discard(WORKTREE_LOCK.name)
+    return names
+
+
+def worktree_exists(worktree_path: str, existing: set[str]) -> bool:
+    """Check a task's worktree against a list_worktree_dirs() listing."""
+    path = Path(worktree_path)
+    if path.parent == WORKTREE_BASE:
+        return path.name in existing
+    return path.exists()
+
+
 def create_worktree(task_name: str, branch: str) -> Path | None:
     """Create git worktree for a task. Returns worktree path or None on failure."""
     worktree_path = WORKTREE_BASE / task_name.replace("/", "-")
@@ -131,26 +398,23 @@ def create_worktree(task_name: str, branch: str) -> Path | None:
     WORKTREE_BASE.mkdir(parents=True, exist_ok=True)
 
     try:
-        # Check if branch exists
-        result = subprocess.run(
-            ["git", "branch", "--list", branch],
-            capture_output=True, cwd=PROJECT_DIR
-        )
-
-        if not result.stdout.strip():
+        branches = local_branches()
+        if branch not in branches:
             # Create branch from current HEAD
             subprocess.run(
                 ["git", "branch", branch],
                 cwd=PROJECT_DIR, check=True, capture_output=True
             )
+            branches.add(branch)
 
         # Create worktree
-        subprocess.run(
-            ["git", "worktree", "add", str(worktree_path), branch],
-            cwd=PROJECT_DIR, check=True, capture_output=True
-        )
+        with worktree_lock():
+            subprocess.run(
+                ["git", "worktree", "add", str(worktree_path), branch],
+                cwd=PROJECT_DIR, check=True, capture_output=True
+            )
         return worktree_path
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, TimeoutError):
         return None
 
 
@@ -179,48 +443,69 @@ def get_main_branch() -> str:
     return "main"
 
 
-def rebase_worktree_to_main(task: dict) -> tuple[bool, str]:
-    """Rebase a task's worktree branch onto main and merge.
+async def rebase_worktree_onto_main(task: dict, main_branch: str) -> tuple[bool, str]:
+    """Rebase a task's worktree branch onto origin's main branch.
 
-    Returns (success, message).
+    Only touches the task's own worktree, so different tasks can be
+    rebased concurrently. Returns (success, message).
     """
-    worktree_path = task.get("worktree_path")
-    branch = task.get("branch")
-
-    if not worktree_path or not branch:
-        return True, "No worktree to rebase"
+    import asyncio
 
-    worktree = Path(worktree_path)
-    if not worktree.exists():
-        return True, "Worktree doesn't exist"
-
-    main_branch = get_main_branch()
+    branch = task["branch"]
+    worktree = Path(task["worktree_path"])
 
     try:
-        # 1. Fetch latest main in the worktree
-        subprocess.run(
-            ["git", "fetch", "origin", main_branch],
-            cwd=worktree, capture_output=True, check=True
+        proc = await asyncio.create_subprocess_exec(
+            "git", "rebase", f"origin/{main_branch}",
+            cwd=worktree, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
         )
+        _, stderr = await proc.communicate()
 
-        # 2. Rebase the task branch onto main
-        result = subprocess.run(
-            ["git", "rebase", f"origin/{main_branch}"],
-            cwd=worktree, capture_output=True
-        )
-
-        if result.returncode != 0:
+        if proc.returncode != 0:
             # Rebase conflict - abort and report
-            subprocess.run(["git", "rebase", "--abort"], cwd=worktree, capture_output=True)
-            return False, f"Rebase conflict in {branch}: {result.stderr.decode()[:200]}"
+            abort = await asyncio.create_subprocess_exec(
+                "git", "rebase", "--abort",
+                cwd=worktree, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            await abort.wait()
+            return False, f"Rebase conflict in {branch}: {stderr.decode()[:200]}"
+
+        return True, f"Rebased {branch} onto origin/{main_branch}"
+
+    except Exception as e:
+        return False, str(e)
+
+
+async def rebase_worktrees(tasks: list[dict], main_branch: str, limit: int) -> list[tuple[bool, str]]:
+    """Rebase worktrees concurrently, at most limit at a time, in input order."""
+    import asyncio
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def rebase_one(task: dict) -> tuple[bool, str]:
+        async with semaphore:
+            return await rebase_worktree_onto_main(task, main_branch)
+
+    return list(await asyncio.gather(*(rebase_one(task) for task in tasks)))
+
+
+def merge_worktree_into_main(task: dict, main_branch: str) -> tuple[bool, str]:
+    """Merge a rebased task branch into main and remove its worktree.
+
+    Works in the main project checkout, so calls must not overlap.
+    Returns (success, message).
+    """
+    branch = task["branch"]
+    worktree = Path(task["worktree_path"])
 
-        # 3. Switch to main in the main project dir and merge
+    try:
+        # Switch to main in the main project dir and merge
         subprocess.run(
             ["git", "checkout", main_branch],
             cwd=PROJECT_DIR, capture_output=True, check=True
         )
 
-        # 4. Merge the rebased branch (fast-forward if possible)
+        # Merge the rebased branch (fast-forward if possible)
         result = subprocess.run(
             ["git", "merge", "--ff-only", branch],
             cwd=PROJECT_DIR, capture_output=True
@@ -235,7 +520,7 @@ def rebase_worktree_to_main(task: dict) -> tuple[bool, str]:
             if result.returncode != 0:
                 return False, f"Merge failed for {branch}: {result.stderr.decode()[:200]}"
 
-        # 5. Clean up worktree
+        # Clean up worktree
         subprocess.run(
             ["git", "worktree", "remove", str(worktree)],
             cwd=PROJECT_DIR, capture_output=True
@@ -252,44 +537,118 @@ def rebase_worktree_to_main(task: dict) -> tuple[bool, str]:
 def rebase_layer_tasks(status: OrchestratorStatus, layer: str) -> list[str]:
     """Rebase all passed tasks for a layer back to main.
 
+    Rebases run concurrently, one per worktree; merges into main then run
+    one at a time because they share the main checkout.
+
     Returns list of error messages (empty if all succeeded).
     """
     errors = []
+    to_merge = []
+    existing = list_worktree_dirs()
 
-    for task_name, task in status.tasks.items():
-        if task["layer"] == layer and task["status"] == TaskStatus.PASSED.value:
-            success, message = rebase_worktree_to_main(task)
-            if not success:
-                errors.append(f"{task_name}: {message}")
-            else:
-                # Clear worktree path since it's been cleaned up
-                task["worktree_path"] = None
+    for task_name in status.layer_index.get(layer, []):
+        task = status.tasks[task_name]
+        if task["status"] != _PASSED:
+            continue
+        worktree_path = task.get("worktree_path")
+        if not worktree_path or not task.get("branch") or not worktree_exists(worktree_path, existing):
+            # Nothing to rebase
+            task["worktree_path"] = None
+            continue
+        to_merge.append(task_name)
+
+    if not to_merge:
+        return errors
+
+    main_branch = get_main_branch()
+
+    # All worktrees share origin/<main>, so fetch it once for the batch
+    try:
+        subprocess.run(
+            ["git", "fetch", "origin", main_branch],
+            cwd=PROJECT_DIR, capture_output=True, check=True
+        )
+    except subprocess.CalledProcessError as e:
+        return [f"{task_name}: Git error: {e}" for task_name in to_merge]
+
+    # Deferred: asyncio is slow to import and most hook runs never rebase
+    import asyncio
+
+    rebased = asyncio.run(rebase_worktrees(
+        [status.tasks[task_name] for task_name in to_merge],
+        main_branch,
+        max(status.max_parallel, 1),
+    ))
+
+    for task_name, (success, message) in zip(to_merge, rebased):
+        task = status.tasks[task_name]
+        if success:
+            success, message = merge_worktree_into_main(task, main_branch)
+        if not success:
+            errors.append(f"{task_name}: {message}")
+        else:
+            # Clear worktree path since it's been cleaned up
+            task["worktree_path"] = None
 
     return errors
 
 
-def check_worktree_has_new_commits(worktree_path: Path, since_hash: str | None) -> bool:
-    """Check if worktree has new commits since a given hash."""
-    if not worktree_path.exists():
-        return False
+def read_git_head(worktree_path: Path) -> str | None:
+    """Resolve HEAD by reading git's files directly instead of running git.
 
+    Understands a main checkout (.git directory) and a linked worktree
+    (.git file pointing into .git/worktrees/<name>), with the branch ref
+    stored loose or in packed-refs. Returns None for anything else so the
+    caller can fall back to git itself.
+    """
     try:
-        result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            cwd=worktree_path, capture_output=True, check=True
-        )
-        current_hash = result.stdout.decode().strip()
+        git_path = worktree_path / ".git"
+        if git_path.is_dir():
+            git_dir = git_path
+        else:
+            pointer = git_path.read_text().strip()
+            if not pointer.startswith("gitdir: "):
+                return None
+            git_dir = worktree_path / pointer[len("gitdir: "):]
+
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref: "):
+            return head if is_commit_hash(head) else None  # Detached HEAD
+        ref = head[len("ref: "):]
+
+        # Branch refs live in the common dir shared by all worktrees
+        common_dir = git_dir
+        commondir_file = git_dir / "commondir"
+        if commondir_file.is_file():
+            common_dir = git_dir / commondir_file.read_text().strip()
+
+        ref_file = common_dir / ref
+        if ref_file.is_file():
+            commit = ref_file.read_text().strip()
+            return commit if is_commit_hash(commit) else None
+
+        packed_refs = common_dir / "packed-refs"
+        if packed_refs.is_file():
+            for line in packed_refs.read_text().splitlines():
+                commit, _, name = line.partition(" ")
+                if name == ref and is_commit_hash(commit):
+                    return commit
+    except OSError:
+        pass
+    return None
 
-        if since_hash is None:
-            return True  # First check, assume work done
 
-        return current_hash != since_hash
-    except subprocess.CalledProcessError:
-        return False
+def is_commit_hash(value: str) -> bool:
+    """Check for a full SHA-1 or SHA-256 object name."""
+    return len(value) in (40, 64) and all(c in "0123456789abcdef" for c in value)
 
 
 def get_worktree_head(worktree_path: Path) -> str | None:
     """Get HEAD commit hash of a worktree."""
+    head = read_git_head(worktree_path)
+    if head is not None:
+        return head
+
     try:
         result = subprocess.run(
             ["git", "rev-parse", "HEAD"],
@@ -300,15 +659,20 @@ def get_worktree_head(worktree_path: Path) -> str | None:
         return None
 
 
-def init_status_from_design(design_path: Path, data: dict) -> OrchestratorStatus:
-    """Initialize status from validated design document."""
-    project = data.get("project", {})
-    now = datetime.now().isoformat()
+def init_status_from_design(
+    design_path: Path, data: dict, design_hash: str | None = None
+) -> OrchestratorStatus:
+    """Initialize status from validated design document.
+
+    design_hash is the document's compute_file_hash, if already known.
+    """
+    project = data.get("project", _EMPTY)
+    now = now_iso()
 
     status = OrchestratorStatus(
         project_name=project.get("name", "unknown"),
         design_doc_path=str(design_path),
-        design_doc_hash=compute_file_hash(design_path),
+        design_doc_hash=design_hash or compute_file_hash(design_path),
         created_at=now,
         updated_at=now,
         current_layer="requirements",
@@ -316,9 +680,14 @@ def init_status_from_design(design_path: Path, data: dict) -> OrchestratorStatus
         max_parallel=project.get("max_parallel_agents", 4),
     )
 
-    # Initialize tasks from design
+    # Initialize tasks from design, noting which tasks trace each requirement
+    req_to_tasks: dict[str, list[str]] = {}
     for task_name, task in data.get("tasks", {}).items():
         branch = task.get("branch", f"swiss-cheese/{task_name}")
+        for req_id in task.get("requirements", []):
+            traced_by = req_to_tasks.setdefault(req_id, [])
+            if not traced_by or traced_by[-1] != task_name:
+                traced_by.append(task_name)
         status.tasks[task_name] = {
             "name": task_name,
             "layer": task["layer"],
@@ -327,19 +696,21 @@ def init_status_from_design(design_path: Path, data: dict) -> OrchestratorStatus
             "requirements": task.get("requirements", []),
             "agent": task.get("agent", "general-purpose"),
             "branch": branch,
-            "status": TaskStatus.PENDING.value,
+            "status": _PENDING,
             "iteration": 0,
             "worktree_path": None,
             "last_commit": None,
             "last_error": None,
         }
+    status.layer_index = build_layer_index(status.tasks)
+    status.unmet_deps, status.dependents = build_dependency_index(status.tasks)
 
     # Initialize gates from layers
     for layer_name, layer_info in LAYERS.items():
         status.gates[layer_name] = {
             "name": layer_name,
             "target": layer_info["makefile_target"],
-            "status": GateStatus.NOT_RUN.value,
+            "status": _GATE_NOT_RUN,
             "output": None,
             "exit_code": None,
         }
@@ -348,14 +719,10 @@ def init_status_from_design(design_path: Path, data: dict) -> OrchestratorStatus
     for req in data.get("requirements", []):
         req_id = req.get("id")
         if req_id:
-            task_ids = [
-                name for name, task in data.get("tasks", {}).items()
-                if req_id in task.get("requirements", [])
-            ]
             status.traceability[req_id] = {
                 "requirement_id": req_id,
                 "title": req.get("title", ""),
-                "task_ids": task_ids,
+                "task_ids": req_to_tasks.get(req_id, []),
                 "test_names": [],
                 "status": "pending",
             }
@@ -366,21 +733,16 @@ def init_status_from_design(design_path: Path, data: dict) -> OrchestratorStatus
 def get_ready_tasks(status: OrchestratorStatus) -> list[str]:
     """Get tasks ready to dispatch (dependencies satisfied, in current layer)."""
     ready = []
+    unmet_deps = status.unmet_deps
 
-    for task_name, task in status.tasks.items():
+    for task_name in status.layer_index.get(status.current_layer, []):
+        task = status.tasks[task_name]
         # Only pending tasks in current layer
-        if task["layer"] != status.current_layer:
-            continue
-        if task["status"] != TaskStatus.PENDING.value:
+        if task["status"] != _PENDING:
             continue
 
         # Check dependencies are satisfied
-        deps_ok = all(
-            status.tasks.get(dep, {}).get("status") == TaskStatus.PASSED.value
-            for dep in task.get("depends_on", [])
-        )
-
-        if deps_ok:
+        if unmet_deps[task_name] == 0:
             ready.append(task_name)
 
     return ready[:status.max_parallel]
@@ -390,7 +752,7 @@ def get_dispatched_tasks(status: OrchestratorStatus) -> list[str]:
     """Get tasks that have been dispatched (subagents working)."""
     return [
         name for name, task in status.tasks.items()
-        if task["status"] == TaskStatus.DISPATCHED.value
+        if task["status"] == _DISPATCHED
     ]
 
 
@@ -401,43 +763,74 @@ def run_makefile_gate(target: str) -> tuple[bool, str, int]:
         return False, "No Makefile found in project root", 1
 
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             ["make", target],
             cwd=PROJECT_DIR,
-            capture_output=True,
-            timeout=600,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
         )
-        output = result.stdout.decode() + result.stderr.decode()
-        return result.returncode == 0, output[-2000:], result.returncode
-    except subprocess.TimeoutExpired:
-        return False, "Gate validation timed out after 10 minutes", -1
     except FileNotFoundError:
         return False, "make command not found", -1
     except Exception as e:
         return False, str(e), -1
 
+    # Only the tail of the output is ever reported, so keep just that much
+    # instead of buffering everything a noisy test suite prints. A reader
+    # thread drains the pipe so proc.wait() can enforce the timeout; it
+    # reads its own copy of the descriptor, so closing proc.stdout never
+    # blocks on it or hands it a reused descriptor.
+    tail = bytearray()
+    read_fd = os.dup(proc.stdout.fileno())
+
+    def drain():
+        try:
+            while chunk := os.read(read_fd, 65536):
+                tail.extend(chunk)
+                del tail[:-MAKE_OUTPUT_TAIL]
+        finally:
+            os.close(read_fd)
+
+    with proc:
+        reader = threading.Thread(target=drain, daemon=True)
+        reader.start()
+        try:
+            returncode = proc.wait(timeout=MAKE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            return False, f"Gate validation timed out after {MAKE_TIMEOUT // 60} minutes", -1
+        # Processes left behind by make may hold the pipe open; don't wait on them
+        reader.join(timeout=MAKE_DRAIN_GRACE)
+
+    output = bytes(tail).decode(errors="replace")
+    return returncode == 0, output, returncode
+
+
+def mark_requirements_verified(status: OrchestratorStatus, task: dict) -> None:
+    """Mark the requirements traced to a passed task as verified."""
+    for req_id in task.get("requirements", []):
+        trace = status.traceability.get(req_id)
+        if trace is not None:
+            trace["status"] = "verified"
+
 
 def all_layer_tasks_complete(status: OrchestratorStatus, layer: str) -> bool:
     """Check if all tasks in a layer are passed/skipped."""
-    layer_tasks = [t for t in status.tasks.values() if t["layer"] == layer]
+    layer_tasks = [status.tasks[name] for name in status.layer_index.get(layer, [])]
     if not layer_tasks:
         return True
     return all(
-        t["status"] in (TaskStatus.PASSED.value, TaskStatus.SKIPPED.value)
+        t["status"] in _DONE
         for t in layer_tasks
     )
 
 
+# LAYERS is fixed at import, so each layer's successor is looked up once
+_NEXT_LAYER: dict[str, str | None] = dict(zip(LAYERS, [*list(LAYERS)[1:], None]))
+
+
 def get_next_layer(current: str) -> str | None:
     """Get the next layer in sequence."""
-    layer_order = list(LAYERS.keys())
-    try:
-        idx = layer_order.index(current)
-        if idx + 1 < len(layer_order):
-            return layer_order[idx + 1]
-    except ValueError:
-        pass
-    return None
+    return _NEXT_LAYER.get(current)
 
 
 def build_task_invocation(task_name: str, task: dict) -> str:
@@ -487,9 +880,9 @@ Prompt for {task_name}:
 def generate_dispatch_prompt(status: OrchestratorStatus, tasks: list[str]) -> str:
     """Generate prompt instructing Claude to spawn parallel Task tools."""
 
-    layer_info = LAYERS.get(status.current_layer, {})
+    layer_info = LAYERS.get(status.current_layer, _EMPTY)
 
-    prompt = f"""## [Swiss Cheese] Dispatch Parallel Subagents
+    parts = [f"""## [Swiss Cheese] Dispatch Parallel Subagents
 
 **Current Layer**: {status.current_layer} - {layer_info.get("description", "")}
 **Tasks to dispatch**: {len(tasks)}
@@ -497,14 +890,14 @@ def generate_dispatch_prompt(status: OrchestratorStatus, tasks: list[str]) -> st
 You must now spawn {len(tasks)} subagent(s) using the Task tool.
 **IMPORTANT**: Call ALL Task tools in a SINGLE message to run them in parallel.
 
-"""
+"""]
 
     for task_name in tasks:
         task = status.tasks[task_name]
-        prompt += build_task_invocation(task_name, task)
-        prompt += "\n---\n"
+        parts.append(build_task_invocation(task_name, task))
+        parts.append("\n---\n")
 
-    prompt += f"""
+    parts.append(f"""
 ## Parallel Execution
 
 To run these tasks in parallel, include ALL {len(tasks)} Task tool calls in your next response.
@@ -521,23 +914,40 @@ I'll spawn {len(tasks)} parallel subagents to work on these tasks.
 ```
 
 After the subagents complete, try to stop again and the orchestrator will validate the gate.
-"""
+""")
+
+    return "".join(parts)
 
-    return prompt
 
+def poll_dispatched_tasks(
+    status: OrchestratorStatus, dispatched: list[str], transcript_path: str
+) -> dict[str, str | None]:
+    """Find dispatched tasks whose work is done, in a single pass.
 
-def check_dispatched_tasks_complete(status: OrchestratorStatus) -> list[str]:
-    """Check which dispatched tasks have new commits (work done)."""
-    completed = []
+    A task is done when its worktree HEAD has moved past last_commit, or
+    when the transcript shows it completed. Returns {task_name: HEAD} for
+    the done tasks; HEAD is None if the task has no readable worktree.
+    """
+    completed: dict[str, str | None] = {}
+    heads: dict[str, str | None] = {}
+    existing = list_worktree_dirs()
 
-    for task_name in get_dispatched_tasks(status):
+    for task_name in dispatched:
         task = status.tasks[task_name]
         worktree_path = task.get("worktree_path")
-
-        if worktree_path and Path(worktree_path).exists():
+        head = None
+        if worktree_path and worktree_exists(worktree_path, existing):
+            head = get_worktree_head(Path(worktree_path))
             last_commit = task.get("last_commit")
-            if check_worktree_has_new_commits(Path(worktree_path), last_commit):
-                completed.append(task_name)
+            if head is not None and (last_commit is None or head != last_commit):
+                completed[task_name] = head
+                continue
+        heads[task_name] = head
+
+    # Fall back to transcript evidence for tasks without new commits
+    if transcript_path and heads:
+        for task_name in check_transcript_for_task_completion(transcript_path, list(heads)):
+            completed[task_name] = heads[task_name]
 
     return completed
 
@@ -546,7 +956,7 @@ def generate_traceability_report(status: OrchestratorStatus) -> dict:
     """Generate traceability matrix report."""
     report = {
         "project": status.project_name,
-        "generated_at": datetime.now().isoformat(),
+        "generated_at": now_iso(),
         "summary": {
             "total_requirements": len(status.traceability),
             "verified": 0,
@@ -576,29 +986,54 @@ def generate_traceability_report(status: OrchestratorStatus) -> dict:
     return report
 
 
+def find_marked_names(text: str, marker: str, names: set[str], found: set[str]) -> None:
+    """Add to found every name in names that appears right after marker.
+
+    One scan for the marker replaces a substring search per name; names
+    are only compared where the marker actually occurs.
+    """
+    start = text.find(marker)
+    while start != -1:
+        name_at = start + len(marker)
+        for name in names:
+            if text.startswith(name, name_at):
+                found.add(name)
+        start = text.find(marker, start + 1)
+
+
 def check_transcript_for_task_completion(transcript_path: str, task_names: list[str]) -> list[str]:
     """Check transcript for evidence that tasks were worked on."""
-    completed = []
-
-    if not transcript_path:
-        return completed
+    if not transcript_path or not task_names:
+        return []
 
     # Expand ~ in path
     path = Path(transcript_path).expanduser()
     if not path.exists():
-        return completed
-
+        return []
+
+    # Commit messages ("[swiss-cheese] <task>") or completion notes
+    # ("completed <task>", matched case-insensitively on the transcript).
+    # The transcript can grow to many MB, so it is streamed in chunks; the
+    # tail of each chunk is carried over so a match can span a boundary.
+    remaining = set(task_names)
+    found: set[str] = set()
+    overlap = len("[swiss-cheese] ") + max(map(len, task_names))
     try:
-        content = path.read_text()
-        # Look for task-related commits or completion indicators
-        for task_name in task_names:
-            # Check for commit messages or task references
-            if f"[swiss-cheese] {task_name}" in content or f"completed {task_name}" in content.lower():
-                completed.append(task_name)
-    except Exception:
+        with open(path, errors="replace") as f:
+            tail = ""
+            while remaining:
+                chunk = f.read(TRANSCRIPT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                window = tail + chunk
+                find_marked_names(window, "[swiss-cheese] ", remaining, found)
+                find_marked_names(window.lower(), "completed ", remaining, found)
+                remaining -= found
+                tail = window[-overlap:]
+    except OSError:
         pass
 
-    return completed
+    return [name for name in task_names if name in found]
 
 
 def identify_task_from_subagent(input_data: dict, status: OrchestratorStatus) -> str | None:
@@ -616,19 +1051,21 @@ def identify_task_from_subagent(input_data: dict, status: OrchestratorStatus) ->
     if task_description in status.tasks:
         return task_description
 
+    dispatched = get_dispatched_tasks(status)
+
     # Try to find task by matching description
-    for task_name, task in status.tasks.items():
-        if task["status"] == TaskStatus.DISPATCHED.value:
-            # Check if description matches
-            if task_name in task_description or task_description in task.get("description", ""):
-                return task_name
+    for task_name in dispatched:
+        # Check if description matches
+        if task_name in task_description or task_description in status.tasks[task_name].get("description", ""):
+            return task_name
 
     # Fallback: check the subagent result for task references
     result = input_data.get("result", "")
-    for task_name, task in status.tasks.items():
-        if task["status"] == TaskStatus.DISPATCHED.value:
-            if f"[swiss-cheese] {task_name}" in result:
-                return task_name
+    found: set[str] = set()
+    find_marked_names(result, "[swiss-cheese] ", set(dispatched), found)
+    for task_name in dispatched:
+        if task_name in found:
+            return task_name
 
     return None
 
@@ -642,27 +1079,31 @@ def handle_subagent_stop(input_data: dict) -> dict:
     - result: The subagent's output/result
     - hook_event_name: "SubagentStop"
     """
+    start_hook_clock()
+
     # Find design document
     design_path = find_design_document()
     if design_path is None:
         return {"continue": True}  # No swiss-cheese project active
 
-    # Parse design document
-    try:
-        data, validation = parse_design_document(design_path)
-    except Exception:
-        return {"continue": True}  # Can't validate, let it continue
-
-    if not validation.valid:
-        return {"continue": True}  # Invalid doc, handle in Stop event
-
     # Load status
-    status_path = get_status_file_path(data["project"]["name"])
+    status_path = get_status_file_path()
     status = OrchestratorStatus.load(status_path)
 
     if status is None:
         return {"continue": True}  # No active orchestration
 
+    # Parse design document, unless it is the one the status was built from
+    try:
+        raw = design_path.read_bytes()
+        current_hash = compute_file_hash(design_path, raw)
+        if status.design_doc_hash != current_hash:
+            _, validation = parse_design_document(design_path, raw, current_hash)
+            if not validation.valid:
+                return {"continue": True}  # Invalid doc, handle in Stop event
+    except Exception:
+        return {"continue": True}  # Can't validate, let it continue
+
     # Identify which task completed
     task_name = identify_task_from_subagent(input_data, status)
 
@@ -671,11 +1112,11 @@ def handle_subagent_stop(input_data: dict) -> dict:
         return {"continue": True}
 
     task = status.tasks.get(task_name)
-    if task is None or task["status"] != TaskStatus.DISPATCHED.value:
+    if task is None or task["status"] != _DISPATCHED:
         return {"continue": True}
 
     # Mark task as completed
-    task["status"] = TaskStatus.COMPLETED.value
+    status.set_task_status(task_name, _COMPLETED)
 
     # Update last_commit if we have a worktree
     if task.get("worktree_path"):
@@ -686,8 +1127,8 @@ def handle_subagent_stop(input_data: dict) -> dict:
     # Check if all dispatched tasks for this layer are now complete
     layer = task["layer"]
     layer_dispatched = [
-        t for t in status.tasks.values()
-        if t["layer"] == layer and t["status"] == TaskStatus.DISPATCHED.value
+        name for name in status.layer_index.get(layer, [])
+        if status.tasks[name]["status"] == _DISPATCHED
     ]
 
     if layer_dispatched:
@@ -707,15 +1148,13 @@ def handle_subagent_stop(input_data: dict) -> dict:
     gate["exit_code"] = exit_code
 
     if passed:
-        gate["status"] = GateStatus.PASSED.value
+        gate["status"] = _GATE_PASSED
         # Mark all completed tasks in this layer as passed
-        for t_name, t in status.tasks.items():
-            if t["layer"] == layer and t["status"] == TaskStatus.COMPLETED.value:
-                t["status"] = TaskStatus.PASSED.value
-                # Update traceability
-                for req_id in t.get("requirements", []):
-                    if req_id in status.traceability:
-                        status.traceability[req_id]["status"] = "verified"
+        for t_name in status.layer_index.get(layer, []):
+            t = status.tasks[t_name]
+            if t["status"] == _COMPLETED:
+                status.set_task_status(t_name, _PASSED)
+                mark_requirements_verified(status, t)
 
         # Rebase passed tasks back to main branch
         rebase_errors = rebase_layer_tasks(status, layer)
@@ -747,8 +1186,7 @@ Please manually resolve conflicts and merge the branches.""",
                 report = generate_traceability_report(status)
                 report_path = PROJECT_DIR / ".claude" / "traceability_matrix.json"
                 report_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(report_path, "w") as f:
-                    json.dump(report, f, indent=2)
+                report_path.write_bytes(encode_json(report, pretty=True))
 
                 status.save(status_path)
                 return {
@@ -762,17 +1200,19 @@ Please manually resolve conflicts and merge the branches.""",
             "systemMessage": f"[Swiss Cheese] Gate '{layer}' passed! Task '{task_name}' verified.",
         }
     else:
-        gate["status"] = GateStatus.FAILED.value
+        gate["status"] = _GATE_FAILED
         # Mark completed tasks as pending for retry
-        for t_name, t in status.tasks.items():
-            if t["layer"] == layer and t["status"] == TaskStatus.COMPLETED.value:
+        max_iterations = status.max_iterations
+        last_error = output[:500]
+        for t_name in status.layer_index.get(layer, []):
+            t = status.tasks[t_name]
+            if t["status"] == _COMPLETED:
                 t["iteration"] += 1
-                if t["iteration"] >= status.max_iterations:
-                    t["status"] = TaskStatus.FAILED.value
-                    t["last_error"] = output[:500]
+                if t["iteration"] >= max_iterations:
+                    status.set_task_status(t_name, _FAILED)
                 else:
-                    t["status"] = TaskStatus.PENDING.value
-                    t["last_error"] = output[:500]
+                    status.set_task_status(t_name, _PENDING)
+                t["last_error"] = last_error
 
         status.save(status_path)
         return {
@@ -800,6 +1240,8 @@ def handle_stop_event(input_data: dict) -> dict:
     - hook_event_name: Should be "Stop"
     - stop_hook_active: Whether stop hook is active
     """
+    start_hook_clock()
+
     # Extract useful fields from input
     transcript_path = input_data.get("transcript_path", "")
 
@@ -808,16 +1250,25 @@ def handle_stop_event(input_data: dict) -> dict:
     if design_path is None:
         return {"decision": "approve"}
 
-    # 2. Parse and validate design document
+    # 2. Load status; re-parse and validate the design document only if it
+    # changed since the status was built from it
+    status_path = get_status_file_path()
+    status = OrchestratorStatus.load(status_path)
+
     try:
-        data, validation = parse_design_document(design_path)
+        raw = design_path.read_bytes()
+        current_hash = compute_file_hash(design_path, raw)
+        if status is None or status.design_doc_hash != current_hash:
+            data, validation = parse_design_document(design_path, raw, current_hash)
+        else:
+            data = validation = None
     except Exception as e:
         return {
             "decision": "block",
             "reason": f"[Swiss Cheese] Invalid design document: {e}\n\nPlease fix the TOML syntax.",
         }
 
-    if not validation.valid:
+    if validation is not None and not validation.valid:
         error_msg = "\n".join(f"- {e.path}: {e.message}" for e in validation.errors)
         schema = get_schema_for_agent()
         return {
@@ -834,35 +1285,24 @@ Please update the design document to match the schema.
 """,
         }
 
-    # 3. Load or create status
-    status_path = get_status_file_path(data["project"]["name"])
-    status = OrchestratorStatus.load(status_path)
-
-    current_hash = compute_file_hash(design_path)
-    if status is None or status.design_doc_hash != current_hash:
-        status = init_status_from_design(design_path, data)
-        status.save(status_path)
+    # 3. Create status for a new or changed design document. Every exit
+    # below saves the status exactly once, so nothing is saved here.
+    if data is not None:
+        status = init_status_from_design(design_path, data, current_hash)
 
     # 4. Check if any tasks are dispatched (subagents running)
     dispatched = get_dispatched_tasks(status)
 
     if dispatched:
         # Check if dispatched tasks have completed (new commits OR transcript evidence)
-        completed = check_dispatched_tasks_complete(status)
+        completed = poll_dispatched_tasks(status, dispatched, transcript_path)
 
-        # Also check transcript for completion evidence
-        if transcript_path:
-            transcript_completed = check_transcript_for_task_completion(transcript_path, dispatched)
-            for task_name in transcript_completed:
-                if task_name not in completed:
-                    completed.append(task_name)
-
-        for task_name in completed:
+        for task_name, head in completed.items():
             task = status.tasks[task_name]
-            task["status"] = TaskStatus.COMPLETED.value
+            status.set_task_status(task_name, _COMPLETED)
             # Update last_commit
             if task.get("worktree_path"):
-                task["last_commit"] = get_worktree_head(Path(task["worktree_path"]))
+                task["last_commit"] = head
 
         # If some tasks still dispatched (no new commits), wait
         still_running = [t for t in dispatched if t not in completed]
@@ -884,31 +1324,32 @@ If the subagents have finished, ensure they committed their changes.
     # 5. Check for completed tasks that need validation
     completed_tasks = [
         name for name, task in status.tasks.items()
-        if task["status"] == TaskStatus.COMPLETED.value
+        if task["status"] == _COMPLETED
     ]
 
     if completed_tasks:
+        current_layer = status.current_layer
+        tasks = status.tasks
+
         # Run gate validation for the current layer
-        gate = status.gates.get(status.current_layer, {})
-        target = gate.get("target", f"validate-{status.current_layer}")
+        gate = status.gates.get(current_layer, {})
+        target = gate.get("target", f"validate-{current_layer}")
 
         passed, output, exit_code = run_makefile_gate(target)
         gate["output"] = output
         gate["exit_code"] = exit_code
 
         if passed:
-            gate["status"] = GateStatus.PASSED.value
+            gate["status"] = _GATE_PASSED
             # Mark completed tasks as passed
             for task_name in completed_tasks:
-                if status.tasks[task_name]["layer"] == status.current_layer:
-                    status.tasks[task_name]["status"] = TaskStatus.PASSED.value
-                    # Update traceability
-                    for req_id in status.tasks[task_name].get("requirements", []):
-                        if req_id in status.traceability:
-                            status.traceability[req_id]["status"] = "verified"
+                task = tasks[task_name]
+                if task["layer"] == current_layer:
+                    status.set_task_status(task_name, _PASSED)
+                    mark_requirements_verified(status, task)
 
             # Rebase passed tasks back to main branch
-            rebase_errors = rebase_layer_tasks(status, status.current_layer)
+            rebase_errors = rebase_layer_tasks(status, current_layer)
             if rebase_errors:
                 error_msg = "\n".join(rebase_errors)
                 status.save(status_path)
@@ -921,23 +1362,24 @@ If the subagents have finished, ensure they committed their changes.
 Please manually resolve conflicts and merge the branches, then try again.""",
                 }
         else:
-            gate["status"] = GateStatus.FAILED.value
+            gate["status"] = _GATE_FAILED
             # Mark tasks as failed, allow retry
+            max_iterations = status.max_iterations
+            last_error = output[:500]
             for task_name in completed_tasks:
-                task = status.tasks[task_name]
-                if task["layer"] == status.current_layer:
+                task = tasks[task_name]
+                if task["layer"] == current_layer:
                     task["iteration"] += 1
-                    if task["iteration"] >= status.max_iterations:
-                        task["status"] = TaskStatus.FAILED.value
-                        task["last_error"] = output[:500]
+                    if task["iteration"] >= max_iterations:
+                        status.set_task_status(task_name, _FAILED)
                     else:
-                        task["status"] = TaskStatus.PENDING.value
-                        task["last_error"] = output[:500]
+                        status.set_task_status(task_name, _PENDING)
+                    task["last_error"] = last_error
 
             status.save(status_path)
             return {
                 "decision": "block",
-                "reason": f"""[Swiss Cheese] Gate validation FAILED for {status.current_layer}
+                "reason": f"""[Swiss Cheese] Gate validation FAILED for {current_layer}
 
 **Makefile target**: `make {target}`
 **Exit code**: {exit_code}
@@ -957,16 +1399,15 @@ Please fix the issues and try again. Tasks have been reset to pending for retry.
         next_layer = get_next_layer(status.current_layer)
         if next_layer:
             status.current_layer = next_layer
-            status.save(status_path)
             # Continue to check for ready tasks in new layer
         else:
             # All layers complete!
             report = generate_traceability_report(status)
             report_path = PROJECT_DIR / ".claude" / "traceability_matrix.json"
             report_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(report_path, "w") as f:
-                json.dump(report, f, indent=2)
+            report_path.write_bytes(encode_json(report, pretty=True))
 
+            status.save(status_path)
             return {
                 "decision": "approve",
                 "systemMessage": f"""[Swiss Cheese] All verification layers complete!
@@ -994,7 +1435,7 @@ Ready for release decision.
             if worktree:
                 task["worktree_path"] = str(worktree)
                 task["last_commit"] = get_worktree_head(worktree)
-            task["status"] = TaskStatus.DISPATCHED.value
+            status.set_task_status(task_name, _DISPATCHED)
 
         status.iteration += 1
         status.save(status_path)
@@ -1007,9 +1448,8 @@ Ready for release decision.
 
     # 8. No tasks ready - might be waiting on dependencies
     pending = [
-        name for name, task in status.tasks.items()
-        if task["status"] == TaskStatus.PENDING.value
-        and task["layer"] == status.current_layer
+        name for name in status.layer_index.get(status.current_layer, [])
+        if status.tasks[name]["status"] == _PENDING
     ]
 
     if pending:
@@ -1034,7 +1474,7 @@ Check the design document for dependency configuration.
 def main():
     """Entry point - read stdin, route to appropriate handler, output result."""
     try:
-        input_data = json.load(sys.stdin)
+        input_data = decode_json(sys.stdin.buffer.read())
     except (json.JSONDecodeError, EOFError):
         input_data = {}
 
@@ -1047,7 +1487,7 @@ def main():
         # Stop event (or unknown - treat as Stop)
         result = handle_stop_event(input_data)
 
-    print(json.dumps(result))
+    sys.stdout.buffer.write(encode_json(result) + b"\n")
 
 
 if __name__ == "__main__":
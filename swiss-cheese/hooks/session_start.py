@@ -16,6 +16,20 @@ try:
 except ImportError:
     import tomli as tomllib  # Python < 3.11
 
+# Display names and result icons for the loop status summary
+LAYER_NAMES = {
+    1: "Requirements",
+    2: "Architecture",
+    3: "TDD Tests",
+    4: "Implementation",
+    5: "Static Analysis",
+    6: "Formal Verification",
+    7: "Dynamic Analysis",
+    8: "Review",
+    9: "Release Analysis",
+}
+LAYER_RESULT_ICONS = {"pass": "✓", "fail": "✗", "skip": "⊘"}
+
 
 @dataclass
 class SessionState:
@@ -51,7 +65,7 @@ class SessionState:
         }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Project:
     """Project metadata."""
     name: str
@@ -59,7 +73,7 @@ class Project:
     worktree_base: str = ".worktrees"
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """Task definition with validation."""
     id: str
@@ -81,7 +95,7 @@ class Task:
             raise ValueError(f"Task {self.id} has invalid status: {self.status}")
 
 
-@dataclass
+@dataclass(slots=True)
 class TaskSpec:
     """Full task specification schema."""
     version: int
@@ -195,18 +209,6 @@ def format_loop_status(state: SessionState) -> str:
     if not state.loop_active and not state.loop_paused:
         return ""
 
-    layer_names = {
-        1: "Requirements",
-        2: "Architecture",
-        3: "TDD Tests",
-        4: "Implementation",
-        5: "Static Analysis",
-        6: "Formal Verification",
-        7: "Dynamic Analysis",
-        8: "Review",
-        9: "Release Analysis",
-    }
-
     lines = ["## Session State\n"]
 
     if state.loop_paused:
@@ -214,15 +216,15 @@ def format_loop_status(state: SessionState) -> str:
     elif state.loop_active:
         lines.append("**🔄 LOOP ACTIVE**\n")
 
-    current_name = layer_names.get(state.current_layer, f"Layer {state.current_layer}")
+    current_name = LAYER_NAMES.get(state.current_layer, f"Layer {state.current_layer}")
     lines.append(f"**Current Layer:** {state.current_layer} - {current_name}\n")
 
     if state.layer_results:
         lines.append("**Layer Results:**")
         for layer_num in sorted(state.layer_results.keys()):
             result = state.layer_results[layer_num]
-            layer_name = layer_names.get(layer_num, f"Layer {layer_num}")
-            icon = {"pass": "✓", "fail": "✗", "skip": "⊘"}.get(result, "?")
+            layer_name = LAYER_NAMES.get(layer_num, f"Layer {layer_num}")
+            icon = LAYER_RESULT_ICONS.get(result, "?")
             lines.append(f"  - Layer {layer_num} ({layer_name}): {icon} {result}")
         lines.append("")
 
@@ -236,7 +238,16 @@ def parse_spec(toml_path: Path) -> TaskSpec:
     """Parse and validate TOML spec into dataclasses."""
     with open(toml_path, "rb") as f:
         data = tomllib.load(f)
+    return spec_from_dict(data)
+
 
+def parse_spec_string(content: str) -> TaskSpec:
+    """Parse and validate TOML spec text into dataclasses."""
+    return spec_from_dict(tomllib.loads(content))
+
+
+def spec_from_dict(data: dict[str, Any]) -> TaskSpec:
+    """Build a validated TaskSpec from decoded TOML data."""
     project_data = data.get("project", {})
     project = Project(
         name=project_data.get("name", ""),
@@ -324,24 +335,27 @@ def get_worktree_path(project_dir: Path, spec: TaskSpec, task: Task) -> Path:
 def list_worktrees(project_dir: Path) -> dict[str, str]:
     """List git worktrees and their branches."""
     try:
-        result = subprocess.run(
+        # Parse porcelain records as git emits them rather than buffering
+        # the whole listing first.
+        with subprocess.Popen(
             ["git", "worktree", "list", "--porcelain"],
             cwd=project_dir,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
-        )
-        if result.returncode != 0:
+        ) as proc:
+            worktrees = {}
+            current_path = None
+            for line in proc.stdout:
+                line = line.rstrip("\n")
+                if line.startswith("worktree "):
+                    current_path = line[9:]
+                elif line.startswith("branch ") and current_path:
+                    worktrees[current_path] = line[7:]
+                    current_path = None
+
+        if proc.returncode != 0:
             return {}
-
-        worktrees = {}
-        current_path = None
-        for line in result.stdout.splitlines():
-            if line.startswith("worktree "):
-                current_path = line[9:]
-            elif line.startswith("branch ") and current_path:
-                worktrees[current_path] = line[7:]
-                current_path = None
-
         return worktrees
     except Exception:
         return {}
@@ -1,4 +1,5 @@
 """Unit tests for swiss-cheese hooks."""
+import subprocess
 import sys
 import tempfile
 from pathlib import Path
@@ -15,9 +16,11 @@ from session_start import (
     TaskSpec,
     SessionState,
     parse_spec,
+    parse_spec_string,
     topological_sort,
     get_ready_tasks,
     get_worktree_path,
+    list_worktrees,
     load_state,
     save_state,
     format_loop_status,
@@ -47,6 +50,12 @@ class TestProject:
         assert p.description == "A test"
         assert p.worktree_base == "wt"
 
+    def test_project_is_immutable(self):
+        """Project metadata cannot be reassigned after parsing."""
+        p = Project(name="test")
+        with pytest.raises(AttributeError):
+            p.name = "other"
+
 
 class TestTask:
     """Test Task dataclass validation."""
@@ -73,6 +82,13 @@ class TestTask:
         assert t.deps == ["task-000"]
         assert t.spec_file == "specs/task.md"
 
+    def test_task_uses_slots(self):
+        """Task stores fields in slots, without a per-instance dict."""
+        t = Task(id="task-001", title="Do thing", acceptance="Tests pass")
+        assert not hasattr(t, "__dict__")
+        with pytest.raises(AttributeError):
+            t.extra = "value"
+
     def test_task_missing_id_fails(self):
         """Task without id raises ValueError."""
         with pytest.raises(ValueError, match="must have an id"):
@@ -166,10 +182,7 @@ acceptance = "No warnings"
 deps = ["task-001"]
 status = "pending"
 """
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
-            f.write(toml_content)
-            f.flush()
-            spec = parse_spec(Path(f.name))
+        spec = parse_spec_string(toml_content)
 
         assert spec.project.name == "test-project"
         assert spec.project.worktree_base == ".wt"
@@ -191,15 +204,29 @@ id = "task-001"
 title = "Only task"
 acceptance = "Done"
 """
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".toml", delete=False) as f:
-            f.write(toml_content)
-            f.flush()
-            spec = parse_spec(Path(f.name))
+        spec = parse_spec_string(toml_content)
 
         assert spec.project.name == "minimal"
         assert spec.project.worktree_base == ".worktrees"  # default
         assert len(spec.tasks) == 1
 
+    def test_parse_toml_file(self):
+        """Parse TOML from a file on disk."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            toml_path = Path(tmpdir) / "tasks.toml"
+            toml_path.write_text(
+                'version = 1\nstatus = "draft"\n\n[project]\nname = "on-disk"\n'
+            )
+            spec = parse_spec(toml_path)
+
+        assert spec.project.name == "on-disk"
+        assert spec.tasks == []
+
+    def test_parse_missing_file(self):
+        """Missing spec file raises FileNotFoundError."""
+        with tempfile.TemporaryDirectory() as tmpdir, pytest.raises(FileNotFoundError):
+            parse_spec(Path(tmpdir) / "tasks.toml")
+
 
 class TestTopologicalSort:
     """Test topological sorting of tasks."""
@@ -373,6 +400,30 @@ class TestGetWorktreePath:
         assert path == Path("/project/custom/path")
 
 
+class TestListWorktrees:
+    """Test git worktree listing."""
+
+    def test_not_a_repo(self):
+        """Directory outside git returns no worktrees."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assert list_worktrees(Path(tmpdir)) == {}
+
+    def test_main_worktree_listed(self):
+        """Main checkout is listed with its branch ref."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir)
+            subprocess.run(
+                ["git", "init", "-q", "-b", "main"], cwd=path, check=True
+            )
+            subprocess.run(
+                ["git", "-c", "user.name=t", "-c", "user.email=t@t",
+                 "commit", "-q", "--allow-empty", "-m", "init"],
+                cwd=path, check=True,
+            )
+            worktrees = list_worktrees(path)
+            assert worktrees == {str(path.resolve()): "refs/heads/main"}
+
+
 class TestSubagentStopHelpers:
     """Test subagent_stop.py helper functions."""
 
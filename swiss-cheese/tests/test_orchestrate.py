@@ -0,0 +1,674 @@
+"""Unit tests for the swiss-cheese orchestrator hook."""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from collections import namedtuple
+from pathlib import Path
+
+import pytest
+
+# Add hooks directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "hooks"))
+
+try:
+    import schema  # noqa: F401
+except ImportError:
+    # orchestrate imports the design schema module; stand in for it when
+    # it is not on the path.
+    class _ValidationResult:
+        def __init__(self):
+            self.valid = True
+            self.errors = []
+
+    _schema = types.ModuleType("schema")
+    _schema.LAYERS = {
+        "requirements": {"makefile_target": "validate-requirements"},
+        "architecture": {"makefile_target": "validate-architecture"},
+        "tdd": {"makefile_target": "validate-tdd"},
+    }
+    _schema.validate_design_document = lambda data: _ValidationResult()
+    _schema.get_schema_for_agent = lambda: ""
+    sys.modules["schema"] = _schema
+
+import orchestrate
+from orchestrate import OrchestratorStatus
+
+
+def make_status(tasks=None, **kwargs):
+    """Build a status with placeholder metadata."""
+    return OrchestratorStatus(
+        project_name="demo",
+        design_doc_path="design.toml",
+        design_doc_hash="abc",
+        created_at="2024-01-01T00:00:00",
+        updated_at="2024-01-01T00:00:00",
+        current_layer="requirements",
+        tasks=tasks or {},
+        **kwargs,
+    )
+
+
+def make_task(layer="requirements", depends_on=(), status="pending"):
+    """Build a task dict as init_status_from_design stores it."""
+    return {
+        "layer": layer,
+        "description": "",
+        "depends_on": list(depends_on),
+        "status": status,
+    }
+
+
+class TestOrchestratorStatusSave:
+    """Test status persistence."""
+
+    def test_save_load_roundtrip(self):
+        """Saved status loads back with the same fields."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "status.json"
+            status = make_status({"a": make_task(), "b": make_task(depends_on=["a"])})
+            status.save(path)
+            loaded = OrchestratorStatus.load(path)
+            assert loaded.to_serializable() == status.to_serializable()
+
+    def test_unchanged_status_not_rewritten(self):
+        """Saving a loaded status with no changes keeps the file."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "status.json"
+            make_status({"a": make_task()}).save(path)
+            before = path.read_bytes()
+            loaded = OrchestratorStatus.load(path)
+            loaded.save(path)
+            assert path.read_bytes() == before
+
+    def test_changed_status_rewritten(self):
+        """Saving after a change writes the new state and timestamp."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "status.json"
+            make_status({"a": make_task()}).save(path)
+            loaded = OrchestratorStatus.load(path)
+            loaded.set_task_status("a", "passed")
+            loaded.updated_at = "stale"
+            loaded.save(path)
+            reloaded = OrchestratorStatus.load(path)
+            assert reloaded.tasks["a"]["status"] == "passed"
+            assert reloaded.updated_at != "stale"
+
+    def test_load_invalid_json(self):
+        """Corrupt status file loads as None."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "status.json"
+            path.write_text("{not json")
+            assert OrchestratorStatus.load(path) is None
+
+
+class TestDependencyIndex:
+    """Test the persisted dependency counts behind get_ready_tasks."""
+
+    def make_chain(self):
+        """Status where b depends on a and c depends on a and b."""
+        return make_status({
+            "a": make_task(),
+            "b": make_task(depends_on=["a"]),
+            "c": make_task(depends_on=["a", "b"]),
+        })
+
+    def assert_consistent(self, status):
+        """Incremental counts match a rebuild from the tasks."""
+        assert (status.unmet_deps, status.dependents) == orchestrate.build_dependency_index(status.tasks)
+
+    def test_initial_counts(self):
+        """Each task counts its unpassed dependencies."""
+        status = self.make_chain()
+        assert status.unmet_deps == {"a": 0, "b": 1, "c": 2}
+        assert orchestrate.get_ready_tasks(status) == ["a"]
+
+    def test_passing_task_releases_dependents(self):
+        """Passing a task decrements every task depending on it."""
+        status = self.make_chain()
+        status.set_task_status("a", "dispatched")
+        status.set_task_status("a", "completed")
+        status.set_task_status("a", "passed")
+        assert status.unmet_deps == {"a": 0, "b": 0, "c": 1}
+        assert orchestrate.get_ready_tasks(status) == ["b"]
+        self.assert_consistent(status)
+
+    def test_gate_retry_keeps_counts(self):
+        """Task reset to pending after passing blocks its dependents again."""
+        status = self.make_chain()
+        status.set_task_status("a", "passed")
+        status.set_task_status("a", "pending")
+        assert status.unmet_deps == {"a": 0, "b": 1, "c": 2}
+        status.set_task_status("a", "completed")
+        status.set_task_status("a", "failed")
+        assert status.unmet_deps == {"a": 0, "b": 1, "c": 2}
+        self.assert_consistent(status)
+
+    def test_unknown_dependency_never_ready(self):
+        """Dependency on a task that does not exist is never satisfied."""
+        status = make_status({"a": make_task(depends_on=["missing"])})
+        assert status.unmet_deps == {"a": 1}
+        assert orchestrate.get_ready_tasks(status) == []
+
+    def test_old_status_file_rebuilds_indexes(self):
+        """Status saved before the indexes existed rebuilds them on load."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "status.json"
+            status = self.make_chain()
+            status.set_task_status("a", "passed")
+            data = status.to_serializable()
+            for key in ("layer_index", "unmet_deps", "dependents"):
+                del data[key]
+            path.write_bytes(orchestrate.encode_json(data))
+            loaded = OrchestratorStatus.load(path)
+            assert loaded.layer_index == {"requirements": ["a", "b", "c"]}
+            assert loaded.unmet_deps == {"a": 0, "b": 0, "c": 1}
+            self.assert_consistent(loaded)
+
+    def test_counts_survive_save_and_load(self):
+        """Persisted counts load back unchanged."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "status.json"
+            status = self.make_chain()
+            status.set_task_status("a", "passed")
+            status.save(path)
+            loaded = OrchestratorStatus.load(path)
+            assert loaded.unmet_deps == {"a": 0, "b": 0, "c": 1}
+            self.assert_consistent(loaded)
+
+
+def git(cwd, *args):
+    """Run git in cwd and return its stripped output."""
+    result = subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd, check=True, capture_output=True, text=True,
+    )
+    return result.stdout.strip()
+
+
+def init_repo(path):
+    """Create a repository with one commit on main."""
+    git(path, "init", "-q", "-b", "main")
+    git(path, "commit", "-q", "--allow-empty", "-m", "init")
+
+
+class TestReadGitHead:
+    """Test resolving HEAD from git's files."""
+
+    def test_main_checkout(self):
+        """Branch ref in a main checkout matches git."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir)
+            init_repo(path)
+            assert orchestrate.read_git_head(path) == git(path, "rev-parse", "HEAD")
+
+    def test_linked_worktree(self):
+        """Linked worktree resolves its own branch through commondir."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "repo"
+            path.mkdir()
+            init_repo(path)
+            worktree = Path(tmpdir) / "wt"
+            git(path, "worktree", "add", "-q", "-b", "task", str(worktree))
+            git(worktree, "commit", "-q", "--allow-empty", "-m", "work")
+            head = orchestrate.read_git_head(worktree)
+            assert head == git(worktree, "rev-parse", "HEAD")
+            assert head != git(path, "rev-parse", "HEAD")
+
+    def test_packed_refs(self):
+        """Branch ref moved into packed-refs is still found."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir)
+            init_repo(path)
+            git(path, "pack-refs", "--all")
+            assert not (path / ".git" / "refs" / "heads" / "main").exists()
+            assert orchestrate.read_git_head(path) == git(path, "rev-parse", "HEAD")
+
+    def test_detached_head(self):
+        """Detached HEAD holds the commit itself."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir)
+            init_repo(path)
+            first = git(path, "rev-parse", "HEAD")
+            git(path, "commit", "-q", "--allow-empty", "-m", "second")
+            git(path, "checkout", "-q", "--detach", first)
+            assert orchestrate.read_git_head(path) == first
+
+    def test_malformed_git_file(self):
+        """Unrecognised .git file returns None."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir)
+            (path / ".git").write_text("not a gitdir pointer\n")
+            assert orchestrate.read_git_head(path) is None
+            assert orchestrate.get_worktree_head(path) is None
+
+    def test_falls_back_to_git(self):
+        """Directory git understands but read_git_head does not uses rev-parse."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir)
+            init_repo(path)
+            subdir = path / "src"
+            subdir.mkdir()
+            assert orchestrate.read_git_head(subdir) is None
+            assert orchestrate.get_worktree_head(subdir) == git(path, "rev-parse", "HEAD")
+
+
+class TestRebaseLayerTasks:
+    """Test rebasing passed tasks and merging them into main."""
+
+    def test_rebase_and_merge(self, monkeypatch):
+        """Clean branches merge into main; a conflicting one is reported and kept."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            origin = root / "origin.git"
+            project = root / "project"
+            upstream = root / "upstream"
+            git(root, "init", "-q", "--bare", "-b", "main", str(origin))
+            git(root, "clone", "-q", str(origin), str(project))
+            git(project, "config", "user.name", "t")
+            git(project, "config", "user.email", "t@t")
+            (project / "shared.txt").write_text("base\n")
+            git(project, "add", "shared.txt")
+            git(project, "commit", "-q", "-m", "init")
+            git(project, "push", "-q", "origin", "main")
+
+            # main moves on upstream after the task branches were cut
+            git(root, "clone", "-q", str(origin), str(upstream))
+            (upstream / "shared.txt").write_text("upstream\n")
+            git(upstream, "commit", "-q", "-am", "upstream change")
+            git(upstream, "push", "-q", "origin", "main")
+
+            worktree_base = project / ".worktrees"
+            monkeypatch.setattr(orchestrate, "PROJECT_DIR", project)
+            monkeypatch.setattr(orchestrate, "WORKTREE_BASE", worktree_base)
+
+            edits = {"task-a": ("a.txt", "a\n"), "task-b": ("b.txt", "b\n"), "task-c": ("shared.txt", "task\n")}
+            tasks = {}
+            for name, (filename, content) in edits.items():
+                worktree = worktree_base / name
+                branch = f"swiss-cheese/{name}"
+                git(project, "worktree", "add", "-q", "-b", branch, str(worktree))
+                (worktree / filename).write_text(content)
+                git(worktree, "add", filename)
+                git(worktree, "commit", "-q", "-m", name)
+                tasks[name] = {
+                    **make_task(status="passed"),
+                    "branch": branch,
+                    "worktree_path": str(worktree),
+                }
+            status = make_status(tasks)
+
+            errors = orchestrate.rebase_layer_tasks(status, "requirements")
+
+            assert len(errors) == 1
+            assert errors[0].startswith("task-c: Rebase conflict in swiss-cheese/task-c")
+            for name in ("task-a", "task-b"):
+                git(project, "merge-base", "--is-ancestor", f"swiss-cheese/{name}", "main")
+                assert status.tasks[name]["worktree_path"] is None
+                assert not (worktree_base / name).exists()
+            git(project, "merge-base", "--is-ancestor", "origin/main", "main")
+            assert git(project, "show", "main:shared.txt") == "upstream"
+            assert git(project, "show", "main:a.txt") == "a"
+            assert git(project, "show", "main:b.txt") == "b"
+
+            # The conflicting task keeps its worktree, with the rebase aborted
+            task_c = worktree_base / "task-c"
+            assert status.tasks["task-c"]["worktree_path"] == str(task_c)
+            assert git(task_c, "status", "--porcelain") == ""
+            assert git(task_c, "log", "-1", "--format=%s") == "task-c"
+
+
+class TestLocalBranches:
+    """Test listing local branch names."""
+
+    def test_branch_names(self, monkeypatch):
+        """Lists every local branch, including ones shadowed by a tag."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir)
+            init_repo(path)
+            git(path, "branch", "swiss-cheese/task-a")
+            git(path, "tag", "main")
+            monkeypatch.setattr(orchestrate, "PROJECT_DIR", path)
+            monkeypatch.setattr(orchestrate, "_BRANCH_CACHE", None)
+            assert orchestrate.local_branches() == {"main", "swiss-cheese/task-a"}
+
+    def test_not_a_repo(self, monkeypatch):
+        """Directory outside git has no branches."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            monkeypatch.setattr(orchestrate, "PROJECT_DIR", Path(tmpdir))
+            monkeypatch.setattr(orchestrate, "_BRANCH_CACHE", None)
+            assert orchestrate.local_branches() == set()
+
+
+class TestWorktreeLock:
+    """Test the cross-process worktree lock."""
+
+    @pytest.fixture
+    def lock(self, monkeypatch):
+        """Lock directory in a temporary worktree base, without backoff delays."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            lock = Path(tmpdir) / ".lock"
+            monkeypatch.setattr(orchestrate, "WORKTREE_LOCK", lock)
+            monkeypatch.setattr(orchestrate, "WORKTREE_LOCK_BACKOFF", (0, 0))
+            yield lock
+
+    def test_acquire_release(self, lock):
+        """Lock directory exists only while held."""
+        with orchestrate.worktree_lock():
+            assert lock.is_dir()
+        assert not lock.exists()
+
+    def test_release_after_reclaim(self, lock):
+        """Lock removed by another hook while held releases quietly."""
+        with orchestrate.worktree_lock():
+            lock.rmdir()
+        assert not lock.exists()
+
+    def test_timeout(self, lock):
+        """Lock held by another process times out after the backoff."""
+        lock.mkdir()
+        with pytest.raises(TimeoutError), orchestrate.worktree_lock():
+            pass
+        assert lock.is_dir()
+
+    def test_stale_lock_reclaimed(self, lock):
+        """Lock older than the stale limit is taken over."""
+        lock.mkdir()
+        old = lock.stat().st_mtime - orchestrate.WORKTREE_LOCK_STALE_AFTER - 1
+        os.utime(lock, (old, old))
+        with orchestrate.worktree_lock():
+            assert lock.stat().st_mtime > old
+        assert list(lock.parent.iterdir()) == []
+
+
+class TestRunMakefileGate:
+    """Test running a gate's Makefile target."""
+
+    @pytest.fixture
+    def make_project(self, monkeypatch):
+        """Project directory with a Makefile built from recipe lines."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir)
+            monkeypatch.setattr(orchestrate, "PROJECT_DIR", path)
+
+            def write_makefile(**targets):
+                (path / "Makefile").write_text("".join(
+                    f"{target}:\n\t{recipe}\n" for target, recipe in targets.items()
+                ))
+
+            yield write_makefile
+
+    def test_target_passes(self, make_project):
+        """Successful target passes with its output."""
+        make_project(gate="@echo ok")
+        assert orchestrate.run_makefile_gate("gate") == (True, "ok\n", 0)
+
+    def test_target_fails(self, make_project):
+        """Failing recipe reports make's nonzero exit code."""
+        make_project(gate="@echo broken; exit 3")
+        passed, output, exit_code = orchestrate.run_makefile_gate("gate")
+        assert not passed
+        assert exit_code == 2
+        assert output.startswith("broken\n")
+
+    def test_output_keeps_tail(self, make_project, monkeypatch):
+        """Only the last MAKE_OUTPUT_TAIL bytes of output are kept."""
+        monkeypatch.setattr(orchestrate, "MAKE_OUTPUT_TAIL", 100)
+        make_project(gate="@seq 1 100000")
+        passed, output, _ = orchestrate.run_makefile_gate("gate")
+        assert passed
+        assert len(output) == 100
+        assert output.endswith("99999\n100000\n")
+
+    def test_timeout(self, make_project, monkeypatch):
+        """Target running past MAKE_TIMEOUT is killed."""
+        monkeypatch.setattr(orchestrate, "MAKE_TIMEOUT", 0.2)
+        make_project(gate="@sleep 3")
+        start = time.monotonic()
+        passed, output, exit_code = orchestrate.run_makefile_gate("gate")
+        assert time.monotonic() - start < 2
+        assert not passed
+        assert "timed out" in output
+        assert exit_code == -1
+
+    def test_background_job_holding_pipe(self, make_project, monkeypatch):
+        """Process left running by the target does not hold up the gate."""
+        monkeypatch.setattr(orchestrate, "MAKE_DRAIN_GRACE", 0.2)
+        make_project(gate="@echo started; sleep 3 &")
+        start = time.monotonic()
+        passed, output, exit_code = orchestrate.run_makefile_gate("gate")
+        assert time.monotonic() - start < 2
+        assert (passed, output, exit_code) == (True, "started\n", 0)
+
+    def test_missing_makefile(self, make_project):
+        """Project without a Makefile fails without running make."""
+        assert orchestrate.run_makefile_gate("gate") == (
+            False, "No Makefile found in project root", 1
+        )
+
+
+class TestTranscriptCompletion:
+    """Test scanning the transcript for completed tasks."""
+
+    @pytest.mark.parametrize("padding", range(8))
+    def test_markers_split_across_chunks(self, monkeypatch, padding):
+        """Markers straddling chunk boundaries are still found."""
+        monkeypatch.setattr(orchestrate, "TRANSCRIPT_CHUNK_SIZE", 8)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            transcript = Path(tmpdir) / "transcript.txt"
+            transcript.write_text(
+                "x" * padding + "commit [swiss-cheese] task-a\n"
+                + "y" * padding + "Subagent COMPLETED task-b.\n"
+            )
+            found = orchestrate.check_transcript_for_task_completion(
+                str(transcript), ["task-b", "task-c", "task-a"]
+            )
+            assert found == ["task-b", "task-a"]
+
+    def test_missing_transcript(self):
+        """Missing transcript finds nothing."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            found = orchestrate.check_transcript_for_task_completion(
+                str(Path(tmpdir) / "missing.txt"), ["task-a"]
+            )
+            assert found == []
+
+
+DESIGN = """
+[project]
+name = "demo"
+max_iterations = 2
+
+[tasks.req-a]
+layer = "requirements"
+
+[tasks.req-b]
+layer = "requirements"
+depends_on = ["req-a"]
+"""
+
+
+# Temporary project for the Stop handler tests; stop() runs one Stop event
+StopProject = namedtuple("StopProject", ["path", "status_path", "stop"])
+
+
+@pytest.fixture
+def project(monkeypatch):
+    """Project directory with a design document and no git worktrees.
+
+    stop() runs one Stop event and returns the hook's result with the
+    number of times the status was saved.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        (path / "design.toml").write_text(DESIGN)
+        status_path = path / "status.json"
+        monkeypatch.setattr(orchestrate, "PROJECT_DIR", path)
+        monkeypatch.setattr(orchestrate, "WORKTREE_BASE", path / ".worktrees")
+        monkeypatch.setattr(orchestrate, "get_status_file_path", lambda: status_path)
+        monkeypatch.setattr(orchestrate, "create_worktree", lambda name, branch: None)
+        monkeypatch.setattr(orchestrate, "run_makefile_gate", lambda target: (True, "ok", 0))
+
+        saves = []
+        save = OrchestratorStatus.save
+
+        def counting_save(self, save_path):
+            saves.append(save_path)
+            save(self, save_path)
+
+        monkeypatch.setattr(OrchestratorStatus, "save", counting_save)
+
+        def stop(transcript=None):
+            input_data = {}
+            if transcript is not None:
+                transcript_path = path / "transcript.txt"
+                transcript_path.write_text(transcript)
+                input_data["transcript_path"] = str(transcript_path)
+            saves.clear()
+            result = orchestrate.handle_stop_event(input_data)
+            return result, len(saves)
+
+        yield StopProject(path, status_path, stop)
+
+
+class TestHandleStopEventSaves:
+    """Test that every exit of the Stop handler saves the status once."""
+
+    def test_no_design_document(self, project):
+        """Project without a design document saves nothing."""
+        (project.path / "design.toml").unlink()
+        result, saves = project.stop()
+        assert result == {"decision": "approve"}
+        assert saves == 0
+
+    def test_dispatch(self, project):
+        """New design document dispatches ready tasks with one save."""
+        result, saves = project.stop()
+        assert result["decision"] == "block"
+        assert saves == 1
+        status = OrchestratorStatus.load(project.status_path)
+        assert status.tasks["req-a"]["status"] == "dispatched"
+        assert status.tasks["req-b"]["status"] == "pending"
+
+    def test_still_running(self, project):
+        """Dispatched task with no completion evidence saves once."""
+        project.stop()
+        result, saves = project.stop()
+        assert "Still running" in result["reason"]
+        assert saves == 1
+
+    def test_gate_passed_dispatches_dependent(self, project):
+        """Passing gate unblocks the dependent task with one save."""
+        project.stop()
+        result, saves = project.stop("[swiss-cheese] req-a")
+        assert result["decision"] == "block"
+        assert saves == 1
+        status = OrchestratorStatus.load(project.status_path)
+        assert status.tasks["req-a"]["status"] == "passed"
+        assert status.tasks["req-b"]["status"] == "dispatched"
+
+    def test_gate_failed(self, project, monkeypatch):
+        """Failing gate resets the task with one save."""
+        monkeypatch.setattr(orchestrate, "run_makefile_gate", lambda target: (False, "boom", 2))
+        project.stop()
+        result, saves = project.stop("[swiss-cheese] req-a")
+        assert "FAILED" in result["reason"]
+        assert saves == 1
+        status = OrchestratorStatus.load(project.status_path)
+        assert status.tasks["req-a"]["status"] == "pending"
+
+    def test_rebase_failed(self, project, monkeypatch):
+        """Rebase failure after a passing gate saves once."""
+        monkeypatch.setattr(orchestrate, "rebase_layer_tasks", lambda status, layer: ["conflict"])
+        project.stop()
+        result, saves = project.stop("[swiss-cheese] req-a")
+        assert "rebase failed" in result["reason"]
+        assert saves == 1
+
+    def test_waiting_on_dependencies(self, project):
+        """Task blocked on an unknown dependency saves once and never dispatches."""
+        (project.path / "design.toml").write_text(DESIGN.replace('["req-a"]', '["missing"]'))
+        project.stop()
+        project.stop("[swiss-cheese] req-a")
+        result, saves = project.stop()
+        assert "Waiting on task dependencies" in result["reason"]
+        assert saves == 1
+        status = OrchestratorStatus.load(project.status_path)
+        assert status.tasks["req-b"]["status"] == "pending"
+
+    def test_all_layers_complete(self, project):
+        """Finishing the last layer writes the report and saves once."""
+        project.stop()
+        project.stop("[swiss-cheese] req-a")
+        project.stop("[swiss-cheese] req-b")
+        # Each Stop event advances past one empty layer
+        project.stop()
+        result, saves = project.stop()
+        assert "All verification layers complete" in result["systemMessage"]
+        assert saves == 1
+        assert (project.path / ".claude" / "traceability_matrix.json").exists()
+
+    def test_nothing_to_do(self, project, monkeypatch):
+        """Layer stuck on a failed task approves with one save."""
+        monkeypatch.setattr(orchestrate, "run_makefile_gate", lambda target: (False, "boom", 2))
+        (project.path / "design.toml").write_text(DESIGN.split("[tasks.req-b]")[0])
+        project.stop()
+        project.stop("[swiss-cheese] req-a")
+        project.stop()
+        project.stop("[swiss-cheese] req-a")
+        result, saves = project.stop()
+        assert result == {"decision": "approve"}
+        assert saves == 1
+        status = OrchestratorStatus.load(project.status_path)
+        assert status.tasks["req-a"]["status"] == "failed"
+
+
+class TestDesignDocumentHash:
+    """Test that each handler hashes the design document once."""
+
+    @pytest.fixture
+    def hashes(self, monkeypatch):
+        """Record every compute_file_hash call."""
+        calls = []
+        compute = orchestrate.compute_file_hash
+
+        def counting_hash(path, data=None):
+            calls.append(path)
+            return compute(path, data)
+
+        monkeypatch.setattr(orchestrate, "compute_file_hash", counting_hash)
+        return calls
+
+    def test_stop_event(self, project, hashes):
+        """New and changed design documents are hashed once per Stop event."""
+        project.stop()
+        assert len(hashes) == 1
+        with open(project.path / "design.toml", "a") as f:
+            f.write("# edited\n")
+        hashes.clear()
+        project.stop()
+        assert len(hashes) == 1
+
+    def test_subagent_stop(self, project, hashes):
+        """Changed design document is hashed once per SubagentStop event."""
+        project.stop()
+        with open(project.path / "design.toml", "a") as f:
+            f.write("# edited\n")
+        hashes.clear()
+        orchestrate.handle_subagent_stop({})
+        assert len(hashes) == 1
+
+
+class TestEncodeJson:
+    """Test JSON encoding helpers."""
+
+    @pytest.mark.parametrize("pretty", [False, True])
+    def test_fallback_matches_orjson(self, monkeypatch, pretty):
+        """Fallback encoder produces the same bytes, non-ASCII text included."""
+        pytest.importorskip("orjson")
+        data = {"a": [1, 2], "b": "x", "title": "Vérifier les entrées ✓"}
+        expected = orchestrate.encode_json(data, pretty)
+        monkeypatch.setattr(orchestrate, "orjson", None)
+        assert orchestrate.encode_json(data, pretty) == expected